@@ -1,10 +1,8 @@
 from typing import List, Tuple
+import re
 import regex as rx
 import yaml
 
-def is_section_heading(line: str, section_rx) -> bool:
-    return any(p.search(line.strip()) for p in section_rx)
-
 def build_sections(lines: List[str], section_rx) -> List[Tuple[str,int]]:
     sections, cur = [], ("BODY", 0)
     for i, ln in enumerate(lines):
@@ -22,12 +20,15 @@ def section_for_index(sections, idx: int) -> str:
         else: break
     return cur
 
+# bytes.translate(None, delete) runs in C: deleting everything but A-Z / a-z leaves the counts
+_NON_UPPER = bytes(i for i in range(256) if not 65 <= i <= 90)
+_NON_LOWER = bytes(i for i in range(256) if not 97 <= i <= 122)
+
 def _uppercase_ratio(s: str) -> float:
-    letters = [c for c in s if c.isalpha()]
-    if not letters: 
-        return 0.0
-    caps = [c for c in letters if c.isupper()]
-    return len(caps) / len(letters)
+    b = s.encode("ascii", "ignore")
+    u = len(b.translate(None, _NON_UPPER))
+    l = len(b.translate(None, _NON_LOWER))
+    return u / (u + l) if (u + l) else 0.0
 
 def is_section_heading(line: str, section_rx) -> bool:
     line = line.strip()
@@ -35,16 +36,30 @@ def is_section_heading(line: str, section_rx) -> bool:
         return False
     if _uppercase_ratio(line) < 0.6:  # prefer ALL CAPS-like headings
         return False
-    return any(p.search(line) for p in section_rx)
+    return section_rx.search(line) is not None
+
+
+def _compile(pattern: str):
+    # stdlib re is faster for plain patterns; fall back to `regex` for what re rejects
+    # (e.g. possessive quantifiers or \p{..} classes in custom rules)
+    try:
+        return re.compile(pattern, re.I)
+    except re.error:
+        return rx.compile(pattern, rx.I)
 
+def _union(patterns: List[str]):
+    # one alternation -> one scan per unit instead of one per pattern
+    return _compile("|".join(f"(?:{p})" for p in patterns))
 
 def compile_rules(cfg_path: str):
     cfg = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
-    section_rx = [rx.compile(p, rx.I) for p in cfg["section_patterns"]]
-    date_rx    = [rx.compile(p, rx.I) for p in cfg["date_patterns"]]
-    event_map  = {k: [rx.compile(p, rx.I) for p in v] for k, v in cfg["events"].items()}
+    section_rx = _union(cfg["section_patterns"])
+    date_rx    = [_compile(p) for p in cfg["date_patterns"]]  # per-pattern: see find_dates
+    event_map  = {k: _union(v) for k, v in cfg["events"].items()}
+    event_rx   = _union([p for v in cfg["events"].values() for p in v])  # prefilter: any label at all?
     dp_settings = {"languages": cfg.get("dateparser", {}).get("languages", ["en"]),
                    "settings": cfg.get("dateparser", {}).get("settings", {"DATE_ORDER":"DMY"})}
     line_as_boundary = cfg.get("line_break_is_boundary", True)
     delims = cfg.get("sentence_delimiters", ["."])
-    return cfg, section_rx, date_rx, event_map, dp_settings, line_as_boundary, delims
+    splitter = None if line_as_boundary else re.compile("[" + re.escape("".join(delims)) + "]")
+    return cfg, section_rx, date_rx, event_rx, event_map, dp_settings, line_as_boundary, splitter
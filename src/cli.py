@@ -1,12 +1,16 @@
 # src/cli.py
-import argparse, csv, json, pathlib, os, re
-from datetime import date
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse, asyncio, csv, json, pathlib, os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback
+    orjson = None
 
 from .config import settings
 from .chunker import compile_rules
-from .rules_engine import parse_page
-from .merge import should_send_to_llm, dedupe_rows, merge_preferring_confidence
+from .rules_engine import make_page_parser
+from .merge import should_send_to_llm, merge_preferring_confidence, finalize_rows
 from .extract_pdf import extract_pdf
 from .extract_docx import extract_docx
 from .extract_txt import extract_txt
@@ -14,33 +18,62 @@ from .ocr import ocr_pdf_pages_to_text
 from .llm_gate import extract_with_llm
 
 
-# -------- helpers (local strict date + page parsing) --------
-_ISO = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-_PNUM = re.compile(r"p\.(\d+)")
+# -------- helpers --------
+def _json_bytes(obj, indent: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
 
-def _valid_iso(d: str) -> bool:
-    if not d or not isinstance(d, str) or not _ISO.match(d):
-        return False
-    y, m, d2 = map(int, d.split("-"))
+# -------- LLM fan-out (asyncio, bounded concurrency) --------
+async def _call_llm(desc: str, page_section: str, source: str):
     try:
-        date(y, m, d2)
-        return True
+        return await extract_with_llm(
+            desc,
+            page_section,
+            source,
+            settings.LLM_PROVIDER,
+            settings.LLM_MODEL,
+        )
     except Exception:
-        return False
+        # swallow per-chunk LLM errors; continue
+        return []
 
-def _page_num(page_section: str) -> int:
-    m = _PNUM.search(page_section or "")
-    return int(m.group(1)) if m else -1
+async def _run_llm(jobs):
+    """
+    Sliding window over `jobs` (an iterable of (desc, page_section, source)):
+    at most LLM_MAX_CALL_RATE calls are in flight, and a new one is admitted
+    only after one completes, so tasks are never materialised all at once.
+    """
+    limit = max(1, settings.LLM_MAX_CALL_RATE)
+    jobs = iter(jobs)
+    pending = set()
+    llm_rows = []
+    while True:
+        for desc, ps, src in jobs:
+            pending.add(asyncio.create_task(_call_llm(desc, ps, src)))
+            if len(pending) >= limit:
+                break
+        if not pending:
+            break
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for fu in done:
+            llm_rows.extend(fu.result())
+    return llm_rows
 
 
 # -------- loader --------
-def load_pages(path: pathlib.Path):
+def load_pages(path: pathlib.Path, ocr: bool = True):
+    """
+    Load pages for one file. With ocr=False, a PDF that needs OCR returns None
+    so the caller can OCR it elsewhere (see main: one PaddleOCR model, parent process).
+    """
     sfx = path.suffix.lower()
     if sfx == ".pdf":
         pages = extract_pdf(str(path))
         # OCR only for scanned pages and only if enabled
         if settings.USE_OCR and any(p.get("is_scanned") for p in pages):
-            return ocr_pdf_pages_to_text(str(path))
+            return ocr_pdf_pages_to_text(str(path)) if ocr else None
         return pages
     elif sfx == ".docx":
         return extract_docx(str(path))
@@ -50,91 +83,146 @@ def load_pages(path: pathlib.Path):
         return []
 
 
+# -------- LLM batching: one call per page/section --------
+_LLM_CHUNK_CHARS = 6000  # matches the chunk_text[:6000] clamp in llm_gate
+_SNIPPET_SEP = "\n---\n"
+
+def _batch_for_llm(uniq):
+    """
+    Group (DESCRIPTION, PAGE/SECTION, SOURCE) keys by (SOURCE, PAGE/SECTION) and join
+    their descriptions, in input (document) order, into chunks of at most _LLM_CHUNK_CHARS.
+    Returns a list of (chunk_text, page_section, source) jobs.
+    """
+    by_page = {}
+    for desc, ps, src in uniq:
+        by_page.setdefault((src, ps), []).append(desc)
+
+    jobs = []
+    for (src, ps), descs in by_page.items():
+        cur, size = [], 0
+        for desc in descs:
+            add = len(desc) + (len(_SNIPPET_SEP) if cur else 0)
+            if cur and size + add > _LLM_CHUNK_CHARS:
+                jobs.append((_SNIPPET_SEP.join(cur), ps, src))
+                cur, size, add = [], 0, len(desc)
+            cur.append(desc)
+            size += add
+        if cur:
+            jobs.append((_SNIPPET_SEP.join(cur), ps, src))
+    return jobs
+
+
+# -------- per-file rule pass (runs in worker processes) --------
+_parse_page = None
+
+def _init_worker(rules_path: str):
+    # compile regexes + build the page parser once per worker instead of pickling them per task
+    global _parse_page
+    _parse_page = make_page_parser(*compile_rules(rules_path))
+
+def _process_file(path: pathlib.Path):
+    """
+    Load + rule-parse one file in a worker.
+    Returns None if the file needs OCR (left to the parent process), else _rows_for_pages(...).
+    """
+    pages = load_pages(path, ocr=False)
+    if pages is None:
+        return None
+    return _rows_for_pages(path, pages, _parse_page)
+
+def _rows_for_pages(path: pathlib.Path, pages, parse_page):
+    """
+    Rule-parse loaded pages.
+    Returns (file_rows, jobs) where jobs holds the batched (chunk_text, PAGE/SECTION, SOURCE)
+    LLM calls for this file (empty unless USE_LLM).
+    """
+    file_rows = []
+    for pg in pages:
+        rows = parse_page(pg)
+        for r in rows:
+            r["SOURCE"] = str(path)
+        file_rows.extend(rows)
+
+    jobs = []
+    if settings.USE_LLM:
+        # gather low-confidence/suspicious chunks for LLM in one pass; near-duplicate
+        # descriptions (same first 100 chars, as in dedupe) collapse to one snippet
+        seen, uniq = set(), []
+        for r in file_rows:
+            if not should_send_to_llm(r, settings.CONFIDENCE_THRESHOLD):
+                continue
+            k = (r["DESCRIPTION"][:100], r["PAGE/SECTION"], r["SOURCE"])
+            if k in seen:
+                continue
+            seen.add(k)
+            uniq.append((r["DESCRIPTION"], r["PAGE/SECTION"], r["SOURCE"]))
+        # build minimal chunk text (use DESCRIPTION context), batched per page/section
+        jobs = _batch_for_llm(uniq)
+    return file_rows, jobs
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--in", dest="inp", required=True, help="File or folder (.pdf/.docx/.txt)")
-    ap.add_argument("--out", dest="out", required=True, help=".csv or .json path")
+    ap.add_argument("--out", dest="out", required=True, help=".csv, .json or .jsonl path")
     ap.add_argument("--rules", default=str(pathlib.Path(__file__).with_name("rules.yaml")))
-    ap.add_argument("--workers", default="8")  # kept for compatibility
+    ap.add_argument("--workers", default="8", help="Processes for the per-file rule pass")
     args = ap.parse_args()
 
-    cfg, section_rx, date_rx, event_map, dp_settings, line_as_boundary, delims = compile_rules(args.rules)
-
     in_path = pathlib.Path(args.inp)
     files = [in_path] if in_path.is_file() else list(in_path.glob("**/*"))
     files = [f for f in files if f.suffix.lower() in (".pdf", ".docx", ".txt")]
 
+    # rule pass: CPU-bound and independent per file -> process pool
+    workers = max(1, int(args.workers))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(args.rules,)) as ex:
+        results = list(ex.map(_process_file, files, chunksize=max(1, len(files) // (4 * workers))))
+
+    # OCR pass: scanned PDFs are OCR'd here so only one PaddleOCR model is ever loaded
+    ocr_idx = [i for i, res in enumerate(results) if res is None]
+    if ocr_idx:
+        parse_page = make_page_parser(*compile_rules(args.rules))
+        for i in ocr_idx:
+            results[i] = _rows_for_pages(files[i], ocr_pdf_pages_to_text(str(files[i])), parse_page)
+
+    # LLM pass: stays in this process so calls from all files share one window
+    llm_by_source = {}
+    if settings.USE_LLM:
+        gen = (job for _, jobs in results for job in jobs)
+        for l in asyncio.run(_run_llm(gen)):
+            llm_by_source.setdefault(l.get("source", ""), []).append(l)
+
     all_rows = []
-    for f in files:
-        pages = load_pages(f)
-        if not pages:
-            continue
-
-        file_rows = []
-        for pg in pages:
-            rows = parse_page(pg, cfg, section_rx, date_rx, event_map, dp_settings, line_as_boundary, delims)
-            for r in rows:
-                r["SOURCE"] = str(f)
-            file_rows.extend(rows)
-
-        if settings.USE_LLM:
-            # gather low-confidence/suspicious chunks for LLM
-            to_llm = [r for r in file_rows if should_send_to_llm(r, settings.CONFIDENCE_THRESHOLD)]
-            if to_llm:
-                # build minimal chunk text (use DESCRIPTION context)
-                uniq = {(r["DESCRIPTION"], r["PAGE/SECTION"], r["SOURCE"]) for r in to_llm}
-                uniq = list(uniq)
-
-                llm_rows = []
-                with ThreadPoolExecutor(max_workers=settings.LLM_MAX_CALL_RATE) as ex:
-                    futs = [
-                        ex.submit(
-                            extract_with_llm,
-                            desc,
-                            page_section,
-                            source,
-                            settings.LLM_PROVIDER,
-                            settings.LLM_MODEL,
-                        )
-                        for (desc, page_section, source) in uniq
-                    ]
-                    for fu in as_completed(futs):
-                        try:
-                            llm_rows.extend(fu.result())
-                        except Exception:
-                            # swallow per-chunk LLM errors; continue
-                            pass
-
-                merged = merge_preferring_confidence(file_rows, llm_rows)
-                all_rows.extend(merged)
-            else:
-                all_rows.extend(file_rows)
+    for file_rows, jobs in results:
+        if jobs:
+            merged = merge_preferring_confidence(file_rows, llm_by_source.get(file_rows[0]["SOURCE"], []))
+            all_rows.extend(merged)
         else:
             all_rows.extend(file_rows)
 
-    # finalize: dedupe → filter invalid dates → stable sort
-    all_rows = dedupe_rows(all_rows)
-    all_rows = [r for r in all_rows if _valid_iso(r.get("DATE", ""))]
-
-    # Sort by SOURCE, page number, DATE, EVENT (stable for deterministic outputs)
-    all_rows.sort(key=lambda r: (
-        r.get("SOURCE", ""),
-        _page_num(r.get("PAGE/SECTION", "")),
-        r.get("DATE", ""),
-        r.get("EVENT", "")
-    ))
+    # finalize: dedupe + filter invalid dates + stable sort (deterministic outputs)
+    all_rows = finalize_rows(all_rows)
 
     outp = pathlib.Path(args.out)
     outp.parent.mkdir(parents=True, exist_ok=True)
-    if outp.suffix.lower() == ".json":
-        outp.write_text(json.dumps(all_rows, indent=2, ensure_ascii=False), encoding="utf-8")
+    sfx = outp.suffix.lower()
+    if sfx == ".json":
+        outp.write_bytes(_json_bytes(all_rows, indent=True))
+        print(f"Wrote {len(all_rows)} rows -> {outp}")
+    elif sfx == ".jsonl":
+        # one row per line: never holds more than one row's serialization
+        with outp.open("wb") as fh:
+            for r in all_rows:
+                fh.write(_json_bytes(r))
+                fh.write(b"\n")
         print(f"Wrote {len(all_rows)} rows -> {outp}")
     else:
         fieldnames = ["DATE", "EVENT", "DESCRIPTION", "PAGE/SECTION", "SOURCE"]
         with outp.open("w", newline="", encoding="utf-8") as fh:
-            wr = csv.DictWriter(fh, fieldnames=fieldnames)
+            # extrasaction="ignore" drops the _confidence/_has_* keys without copying each row
+            wr = csv.DictWriter(fh, fieldnames=fieldnames, extrasaction="ignore")
             wr.writeheader()
-            wr.writerows([{k: v for k, v in r.items() if k in fieldnames} for r in all_rows])
+            wr.writerows(all_rows)
         print(f"Wrote {len(all_rows)} rows -> {outp}")
 
 
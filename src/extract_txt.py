@@ -1,25 +1,40 @@
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
+import mmap
 import re
-from pathlib import Path
+
+_PAGE_MARK = re.compile(r"^\s*(\d{3,4})\b")
+
+def _iter_lines(path: str) -> Iterator[str]:
+    # mmap + per-line decode: the whole file is never held as one Python str
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:  # mmap rejects empty files
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for raw in iter(mm.readline, b""):
+                # str.splitlines also breaks on \r, \f, ... like the old read_text().splitlines()
+                yield from raw.decode("utf-8", "ignore").splitlines()
 
 def extract_txt(path: str) -> List[Dict[str, Any]]:
-    txt = Path(path).read_text(encoding="utf-8", errors="ignore")
-    raw_lines = [ln.strip() for ln in txt.splitlines() if ln.strip()]
-    page_mark = re.compile(r"^\s*(\d{3,4})\b")
     pages, cur_page, cur_lines = [], 1, []
-    for ln in raw_lines:
-        m = page_mark.match(ln)
+    mark_lines = []  # page-mark-only lines; only needed if no page gets any content
+    for ln in _iter_lines(path):
+        m = _PAGE_MARK.match(ln)  # pattern allows leading whitespace, so no strip needed first
         if m:
             if cur_lines:
                 pages.append({"page": cur_page, "text": "\n".join(cur_lines), "lines": cur_lines, "is_scanned": False})
                 cur_lines = []
             try: cur_page = int(m.group(1))
             except: cur_page += 1
-            ln = ln[m.end():].strip()
-            if not ln: continue
+            rest = ln[m.end():].strip()
+            if not rest:
+                mark_lines.append(ln.strip())
+                continue
+            ln = rest
+        ln = ln.strip()
+        if not ln: continue
         cur_lines.append(ln)
     if cur_lines:
         pages.append({"page": cur_page, "text": "\n".join(cur_lines), "lines": cur_lines, "is_scanned": False})
     if not pages:
-        pages = [{"page": 1, "text": txt, "lines": raw_lines, "is_scanned": False}]
+        pages = [{"page": 1, "text": "\n".join(mark_lines), "lines": mark_lines, "is_scanned": False}]
     return pages
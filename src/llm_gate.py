@@ -1,10 +1,16 @@
 # src/llm_gate.py
-import json
 import os
-from typing import List, Dict, Any
-from pydantic import BaseModel, Field
-import dateparser
+from functools import lru_cache
+from typing import List, TypedDict
 import google.generativeai as genai
+from .rules_engine import parse_date_cached
+
+try:
+    from orjson import loads as _json_loads  # C parser, ~2-5x faster than stdlib
+except ImportError:
+    from json import loads as _json_loads
+
+_DMY = (("DATE_ORDER", "DMY"),)
 
 # ---- Canonical event labels ----
 EVENTS = {
@@ -13,80 +19,84 @@ EVENTS = {
     "Lease", "Appeal", "Event"
 }
 
-# ---- Pydantic models ----
-class Row(BaseModel):
+# ---- Row shape (typing only; repaired rows are already normalized) ----
+class Row(TypedDict):
     date: str
     event: str
-    description: str = Field(max_length=400)
+    description: str  # <= 400 chars, clamped during repair
     page_section: str
     source: str
 
-class Rows(BaseModel):
-    rows: List[Row]
+# ---- Gemini structured-output config (built once) ----
+# NOTE: Gemini's schema doesn't accept "maxLength", so we keep it simple and clamp in Python later.
+_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "rows": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "date": {"type": "string"},
+                    "event": {"type": "string"},
+                    "description": {"type": "string"},
+                    "page_section": {"type": "string"},
+                    "source": {"type": "string"}
+                },
+                "required": ["date", "event", "description", "page_section", "source"]
+            }
+        }
+    },
+    "required": ["rows"]
+}
 
-# ---- Internal: Gemini call with structured JSON output ----
-def _llm_complete(prompt: str, provider: str, model: str, schema: dict) -> str:
+# Enforce JSON & schema at generation time (Gemini supports this config)
+_GEN_CFG = {
+    "response_mime_type": "application/json",
+    "response_schema": _SCHEMA,
+    "temperature": 0.0,
+}
+
+@lru_cache(maxsize=None)
+def _get_model(model: str) -> genai.GenerativeModel:
     """
-    Calls Gemini with structured JSON output enforced via response_mime_type/response_schema.
-    Returns a JSON string.
+    Configure the SDK and build the GenerativeModel once per model name.
     """
-    if provider.lower() != "gemini":
-        raise RuntimeError(f"Unsupported LLM provider: {provider}")
-
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         raise RuntimeError("Missing GEMINI_API_KEY in environment variables.")
 
     genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model, generation_config=_GEN_CFG)
 
-    # Enforce JSON & schema at generation time (Gemini supports this config)
-    generation_config = {
-        "response_mime_type": "application/json",
-        "response_schema": schema,
-        "temperature": 0.0,
-    }
+# ---- Internal: Gemini call with structured JSON output ----
+async def _llm_complete(prompt: str, provider: str, model: str) -> str:
+    """
+    Calls Gemini with structured JSON output enforced via response_mime_type/response_schema.
+    Returns a JSON string.
+    """
+    if provider.lower() != "gemini":
+        raise RuntimeError(f"Unsupported LLM provider: {provider}")
 
-    model_obj = genai.GenerativeModel(model, generation_config=generation_config)
-    resp = model_obj.generate_content(prompt)
+    resp = await _get_model(model).generate_content_async(prompt)
     return resp.text  # already JSON text by contract
 
 # ---- Public API used by cli.py ----
-def extract_with_llm(chunk_text: str, page_section: str, source: str,
-                     provider: str, model: str) -> List[Dict[str, Any]]:
+async def extract_with_llm(chunk_text: str, page_section: str, source: str,
+                           provider: str, model: str) -> List[Row]:
     """
     Ask the LLM to extract rows from chunk_text.
     - Enforces JSON schema at decode time.
     - Repairs/normalizes date & event.
     - Skips rows without a valid date (no crashes).
     """
-    # NOTE: Gemini's schema doesn't accept "maxLength", so we keep it simple and clamp in Python later.
-    schema = {
-        "type": "object",
-        "properties": {
-            "rows": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "date": {"type": "string"},
-                        "event": {"type": "string"},
-                        "description": {"type": "string"},
-                        "page_section": {"type": "string"},
-                        "source": {"type": "string"}
-                    },
-                    "required": ["date", "event", "description", "page_section", "source"]
-                }
-            }
-        },
-        "required": ["rows"]
-    }
-
     prompt = f"""
 You extract legal case events. STRICT RULES:
 - Return ONLY rows that have an explicit date in the text.
 - Normalize dates to YYYY-MM-DD if possible; if uncertain, keep the original date string.
 - Keep description <= 2 lines and quote key phrase(s).
 - Do not invent information not present in the text.
+- The text may contain multiple snippets separated by lines of `---`; return rows across all snippets.
 - If no dated events are found, return: {{"rows":[]}}.
 
 Meta:
@@ -99,15 +109,15 @@ Text:
 
     # ---- Call Gemini and parse JSON ----
     try:
-        raw = _llm_complete(prompt, provider, model, schema)
-        data = json.loads(raw)  # should be valid JSON
+        raw = await _llm_complete(prompt, provider, model)
+        data = _json_loads(raw)  # should be valid JSON
     except Exception as e:
         print(f"[LLM ERROR] JSON/LLM call failed: {e}")
         return []
 
-    # ---- Repair & normalize before Pydantic validation ----
+    # ---- Repair & normalize ----
     rows = data.get("rows", []) if isinstance(data, dict) else []
-    repaired: List[Dict[str, Any]] = []
+    repaired: List[Row] = []
 
     for r in rows:
         # Coerce all fields to strings to avoid None/int surprises
@@ -124,18 +134,14 @@ Text:
 
         # If date missing/empty: try to parse a date from the description
         if not r_date:
-            dt_guess = dateparser.parse(r_desc, settings={"DATE_ORDER": "DMY"})
-            if dt_guess:
-                r_date = dt_guess.date().isoformat()
+            r_date = parse_date_cached(r_desc, None, _DMY) or ""
 
         # If still no date, skip this row
         if not r_date:
             continue
 
         # Normalize date to ISO if possible
-        dt = dateparser.parse(r_date, settings={"DATE_ORDER": "DMY"})
-        if dt:
-            r_date = dt.date().isoformat()
+        r_date = parse_date_cached(r_date, None, _DMY) or r_date
 
         # Clamp event to known set
         if r_event not in EVENTS:
@@ -153,15 +159,5 @@ Text:
             "source": r_source
         })
 
-    # ---- Validate with Pydantic (defensive) ----
-    try:
-        valid = Rows(rows=repaired).model_dump()["rows"]
-    except Exception as e:
-        print(f"[LLM ERROR] Validation failed after repair: {e}")
-        # Fallback: keep only minimally valid rows
-        valid = []
-        for r in repaired:
-            if r.get("date") and r.get("description"):
-                valid.append(r)
-
-    return valid
+    # ---- Minimal validity check (fields are already coerced to str and clamped) ----
+    return [r for r in repaired if r["date"] and r["description"]]
@@ -1,6 +1,8 @@
 # src/merge.py
 from typing import List, Dict, Any, Tuple
-from datetime import date
+from calendar import monthrange
+from functools import lru_cache
+from operator import itemgetter
 import re
 
 # ---------- constants ----------
@@ -10,7 +12,6 @@ EVENTS = {
 }
 
 # ---------- helpers ----------
-_ISO = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 _PNUM = re.compile(r"p\.(\d+)")
 _WS = re.compile(r"\s+")
 _ANALYSIS_CUES = (
@@ -20,23 +21,33 @@ _ANALYSIS_CUES = (
 )
 
 def _valid_iso(d: str) -> bool:
-    if not d or not isinstance(d, str) or not _ISO.match(d):
+    # strict YYYY-MM-DD via slicing (no regex match, no date() + exception per row)
+    if not isinstance(d, str) or len(d) != 10 or not d.isascii() or d[4] != "-" or d[7] != "-":
         return False
-    y, m, d2 = map(int, d.split("-"))
-    try:
-        date(y, m, d2)
-        return True
-    except Exception:
+    ys, ms, ds = d[:4], d[5:7], d[8:]
+    if not (ys.isdigit() and ms.isdigit() and ds.isdigit()):
         return False
+    y, m, d2 = int(ys), int(ms), int(ds)
+    return y >= 1 and 1 <= m <= 12 and 1 <= d2 <= monthrange(y, m)[1]
 
 def _looks_like_analysis(text: str) -> bool:
     low = (text or "").lower()
     return any(k in low for k in _ANALYSIS_CUES)
 
+# PAGE/SECTION and EVENT values repeat across rows (one per page/section, ~15 labels),
+# so both normalizers are memoized on the raw string.
+@lru_cache(maxsize=4096)
 def _page_num(page_section: str) -> int:
-    m = _PNUM.search(page_section or "")
+    ps = page_section or ""
+    # fast path for our own "p.<n> / <section>" format; regex for anything else
+    if ps.startswith("p."):
+        n = ps[2:].partition(" ")[0]
+        if n.isascii() and n.isdigit():
+            return int(n)
+    m = _PNUM.search(ps)
     return int(m.group(1)) if m else -1
 
+@lru_cache(maxsize=1024)
 def _norm_event(ev: str) -> str:
     ev = (ev or "").strip().title()
     return ev if ev in EVENTS else "Event"
@@ -75,26 +86,30 @@ def should_send_to_llm(row: Dict[str, Any], threshold: float) -> bool:
         return True
     return False
 
-# ---------- dedupe ----------
-def dedupe_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# ---------- finalize (dedupe + filter + sort) ----------
+def finalize_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    De-dup by (SOURCE, DATE, EVENT, page_num, first 100 chars of DESCRIPTION).
-    Keeps first occurrence.
+    Final pass over all rows, in one walk:
+      - drop rows without a valid ISO DATE
+      - de-dup by (SOURCE, DATE, EVENT, page_num, first 100 chars of DESCRIPTION),
+        keeping the first occurrence
+      - stable sort by (SOURCE, page_num, DATE, EVENT) on precomputed keys
     """
-    seen, out = set(), []
+    seen, keyed = set(), []
     for r in rows:
-        key = (
-            r.get("SOURCE", ""),
-            r.get("DATE", ""),
-            _norm_event(r.get("EVENT", "")),
-            _page_num(r.get("PAGE/SECTION", "")),
-            (r.get("DESCRIPTION", "") or "")[:100],
-        )
+        d = r.get("DATE", "")
+        if not _valid_iso(d):
+            continue
+        src = r.get("SOURCE", "")
+        pnum = _page_num(r.get("PAGE/SECTION", ""))
+        ev = r.get("EVENT", "")
+        key = (src, d, _norm_event(ev), pnum, (r.get("DESCRIPTION", "") or "")[:100])
         if key in seen:
             continue
         seen.add(key)
-        out.append(r)
-    return out
+        keyed.append(((src, pnum, d, ev), r))
+    keyed.sort(key=itemgetter(0))
+    return [r for _, r in keyed]
 
 # ---------- merge ----------
 def merge_preferring_confidence(rule_rows: List[Dict[str, Any]],
@@ -106,22 +121,6 @@ def merge_preferring_confidence(rule_rows: List[Dict[str, Any]],
       - Clean/normalize fields
       - Drop invalid dates at the end
     """
-    def k_rule(r: Dict[str, Any]) -> Tuple[str, str, str, int]:
-        return (
-            r.get("SOURCE", ""),
-            r.get("DATE", ""),
-            _norm_event(r.get("EVENT", "")),
-            _page_num(r.get("PAGE/SECTION", "")),
-        )
-
-    def k_llm(l: Dict[str, Any]) -> Tuple[str, str, str, int]:
-        return (
-            l.get("source", ""),
-            l.get("date", ""),
-            _norm_event(l.get("event", "")),
-            _page_num(l.get("page_section", "")),
-        )
-
     out: Dict[Tuple[str, str, str, int], Dict[str, Any]] = {}
 
     # Seed with rules
@@ -134,7 +133,7 @@ def merge_preferring_confidence(rule_rows: List[Dict[str, Any]],
             "PAGE/SECTION": _clean_text(r.get("PAGE/SECTION", "")),
             "_confidence": float(r.get("_confidence", 0.0)),
         }
-        key = k_rule(row)
+        key = (row["SOURCE"], row["DATE"], row["EVENT"], _page_num(row["PAGE/SECTION"]))
         cur = out.get(key)
         out[key] = row if cur is None else _better(cur, row)
 
@@ -148,7 +147,7 @@ def merge_preferring_confidence(rule_rows: List[Dict[str, Any]],
             "PAGE/SECTION": _clean_text(l.get("page_section", "")),
             "_confidence": 0.75,  # LLM default confidence
         }
-        key = k_llm(l)
+        key = (l.get("source", ""), l.get("date", ""), row["EVENT"], _page_num(l.get("page_section", "")))
         cur = out.get(key)
         out[key] = row if cur is None else _better(cur, row)
 
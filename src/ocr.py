@@ -1,6 +1,5 @@
 from typing import Dict, Any, List
 import numpy as np
-import cv2
 from paddleocr import PaddleOCR
 import fitz
 
@@ -17,10 +16,9 @@ def ocr_pdf_pages_to_text(path: str) -> List[Dict[str, Any]]:
     pages = []
     ocr = _get_ocr()
     for i, page in enumerate(doc, start=1):
-        pix = page.get_pixmap(matrix=fitz.Matrix(2,2))  # 2x zoom for OCR clarity
+        # 2x zoom for OCR clarity; alpha=False renders RGB directly (no RGBA->RGB copy)
+        pix = page.get_pixmap(matrix=fitz.Matrix(2,2), alpha=False)
         img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
-        if pix.n == 4:
-            img = cv2.cvtColor(img, cv2.COLOR_RGBA2RGB)
         res = ocr.ocr(img, cls=True)
         lines = []
         if res and res[0]:
@@ -1,32 +1,55 @@
-from typing import List, Dict, Any
-import regex as rx
+from functools import lru_cache
+from typing import Callable, List, Dict, Any, Tuple
 import dateparser
 from .chunker import build_sections, section_for_index
 
-def find_dates(unit: str, date_rx, dp_settings) -> List[str]:
+def _freeze(v):
+    # list-valued settings (PARSERS, SKIP_TOKENS, ...) -> tuples so the cache key hashes
+    return tuple(_freeze(x) for x in v) if isinstance(v, list) else v
+
+def _thaw(v):
+    return [_thaw(x) for x in v] if isinstance(v, tuple) else v
+
+@lru_cache(maxsize=65536)
+def parse_date_cached(s: str, languages: Tuple[str, ...] | None, settings: Tuple[Tuple[str, Any], ...]) -> str | None:
+    """
+    Memoized dateparser.parse -> ISO date string (or None).
+    Args must be hashable, so languages/settings are passed as tuples
+    (list values frozen to tuples, see dp_cache_key).
+    """
+    dt = dateparser.parse(s, languages=list(languages) if languages else None,
+                          settings={k: _thaw(v) for k, v in settings})
+    return dt.date().isoformat() if dt else None
+
+def dp_cache_key(dp_settings) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, Any], ...]]:
+    """(languages, settings) from compile_rules' dp_settings, as hashable tuples for parse_date_cached."""
+    return (tuple(dp_settings.get("languages", ["en"])),
+            tuple(sorted((k, _freeze(v)) for k, v in dp_settings.get("settings", {"DATE_ORDER":"DMY"}).items())))
+
+def find_dates(unit: str, date_rx, languages, settings) -> List[str]:
+    # Each date pattern is scanned on its own (no union): with DATE_ORDER=DMY, dateparser
+    # can't parse year-first spans like "2022/03/15", and only the separate DMY scan of
+    # the tail keeps a date on such units.
     hits = set()
     for pat in date_rx:
         for m in pat.finditer(unit):
-            s = m.group(0)
-            dt = dateparser.parse(s,
-                languages=dp_settings.get("languages", ["en"]),
-                settings=dp_settings.get("settings", {"DATE_ORDER":"DMY"})
-            )
-            if dt:
-                hits.add(dt.date().isoformat())
+            iso = parse_date_cached(m.group(0), languages, settings)
+            if iso:
+                hits.add(iso)
     return sorted(hits)
 
 _STATUTE_CUES = ("act", "amendment", "section", "sub-section", "clause", "with effect from")
 
-def detect_event_type(text: str, event_map) -> str | None:
+def detect_event_type(text: str, event_rx, event_map) -> str | None:
     low = text.lower()
     # if it's clearly statutory context and not a court step, avoid mislabeling as Hearing/Order
     if any(k in low for k in _STATUTE_CUES) and not ("hearing" in low or "order" in low or "decree" in low or "judgment" in low):
         return None  # treat as non-event context
-    for label, patterns in event_map.items():
-        for pat in patterns:
-            if pat.search(low):
-                return label
+    if not event_rx.search(low):
+        return None
+    for label, pat in event_map.items():
+        if pat.search(low):
+            return label
     return None
 
 
@@ -39,27 +62,41 @@ def confidence_for(unit: str, event: str | None, dates: List[str], in_proceeding
     if len(dates) > 1: score -= 0.1
     return max(0.0, min(1.0, score))
 
-def parse_page(page: Dict[str,Any], cfg, section_rx, date_rx, event_map, dp_settings, line_as_boundary, delims) -> List[Dict[str,Any]]:
-    out = []
-    lines = page["lines"]
-    sections = build_sections(lines, section_rx)
-    for i, ln in enumerate(lines):
-        units = [ln] if line_as_boundary else rx.split("["+rx.escape("".join(delims))+"]", ln)
-        for u in [x.strip() for x in units if x.strip()]:
-            dates = find_dates(u, date_rx, dp_settings)
-            event = detect_event_type(u, event_map)
-            if not dates and not event:
-                continue
-            section = section_for_index(sections, i)
-            conf = confidence_for(u, event, dates, "proceeding" in section.lower() or "hearing" in section.lower())
-            out.append({
-                "DATE": (dates[0] if dates else ""),
-                "EVENT": (event or "Event"),
-                "DESCRIPTION": u,
-                "PAGE/SECTION": f"p.{page['page']} / {section}",
-                "SOURCE": "",
-                "_confidence": conf,
-                "_has_date": bool(dates),
-                "_has_event": bool(event)
-            })
-    return out
+def make_page_parser(cfg, section_rx, date_rx, event_rx, event_map, dp_settings, line_as_boundary,
+                     splitter) -> Callable[[Dict[str,Any]], List[Dict[str,Any]]]:
+    """
+    Specialize page parsing for one compiled rule set (see compile_rules).
+    Per-call setup (dateparser cache key, sentence splitter) happens once here;
+    the returned parse_page(page) closure only does per-line work.
+    """
+    languages, settings = dp_cache_key(dp_settings)
+
+    def parse_page(page: Dict[str,Any]) -> List[Dict[str,Any]]:
+        out = []
+        lines = page["lines"]
+        sections = build_sections(lines, section_rx)
+        # lowercase each section name once, not once per emitted row
+        in_proc = {name: ("proceeding" in name.lower() or "hearing" in name.lower()) for name, _ in sections}
+        in_proc.setdefault("BODY", False)
+        for i, ln in enumerate(lines):
+            units = [ln] if splitter is None else splitter.split(ln)
+            for u in [x.strip() for x in units if x.strip()]:
+                dates = find_dates(u, date_rx, languages, settings)
+                event = detect_event_type(u, event_rx, event_map)
+                if not dates and not event:
+                    continue
+                section = section_for_index(sections, i)
+                conf = confidence_for(u, event, dates, in_proc[section])
+                out.append({
+                    "DATE": (dates[0] if dates else ""),
+                    "EVENT": (event or "Event"),
+                    "DESCRIPTION": u,
+                    "PAGE/SECTION": f"p.{page['page']} / {section}",
+                    "SOURCE": "",
+                    "_confidence": conf,
+                    "_has_date": bool(dates),
+                    "_has_event": bool(event)
+                })
+        return out
+
+    return parse_page
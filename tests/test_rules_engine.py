@@ -0,0 +1,15 @@
+from pathlib import Path
+
+from src.chunker import compile_rules
+from src.rules_engine import dp_cache_key, find_dates
+
+RULES = Path(__file__).resolve().parents[1] / "src" / "rules.yaml"
+
+
+def test_year_first_dates_keep_a_date():
+    # With DATE_ORDER=DMY, dateparser can't parse the full year-first span; the unit must
+    # still get a date from the other patterns, or its row is dropped at finalize.
+    _, _, date_rx, _, _, dp_settings, _, _ = compile_rules(str(RULES))
+    languages, settings = dp_cache_key(dp_settings)
+    assert find_dates("Filed on 2022/03/15 before the court.", date_rx, languages, settings)
+    assert find_dates("Listed for hearing on 2022-04-01.", date_rx, languages, settings)